@@ -1,9 +1,25 @@
+import json
+import logging
 import os
+import threading
 import time
 import datetime as dt
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ResponseError
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used if orjson isn't installed
+    orjson = None
+
+logger = logging.getLogger(__name__)
 
 # -----------------------------
 # Constants / Config
@@ -18,22 +34,133 @@ ESPN_INJURIES_URL = "https://site.api.espn.com/apis/site/v2/sports/basketball/nb
 # If this causes SSL issues on your VPS, update the schedule function below
 NBA_SCHEDULE_URL_TEMPLATE = "https://data.nba.net/prod/v2/{season}/schedule.json"
 
+USER_AGENT = "fbs/1.0"
+
+# Concurrent requests for the per-week Sleeper transactions fan-out
+TRANSACTION_WORKERS = 8
+
+# Concurrent BallDontLie game-log requests; kept low for the free-tier rate
+# limit (429s are retried with backoff by the session adapter)
+GAME_LOG_WORKERS = 6
+
+# Dates per BallDontLie /stats request (repeated dates[] params); keeps the
+# query string well under typical URL length limits
+GAME_LOG_DATES_PER_REQUEST = 14
+
+# Local cache for slow-changing payloads (e.g. the multi-MB Sleeper player pool)
+CACHE_DIR = os.getenv("FBS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "fbs"))
+SLEEPER_PLAYERS_CACHE_TTL = 24 * 3600  # Sleeper asks for at most one pull per day
+ESPN_INJURIES_CACHE_TTL = 5 * 60
+NBA_SCHEDULE_CACHE_TTL = 12 * 3600
+
+
+# -----------------------------
+# HTTP session
+# -----------------------------
+
+def _build_session() -> requests.Session:
+    """
+    Build the shared Session used by every fetcher in this module.
+
+    All of our calls hit the same handful of hosts back to back (Sleeper,
+    BallDontLie, ESPN), so keeping one keep-alive connection pool per host
+    saves a TCP + TLS handshake on every request. Transient 429/5xx
+    responses are retried with exponential backoff by the adapter.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "User-Agent": USER_AGENT,
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+_SESSION = _build_session()
+
+
+class _TokenBucket:
+    """
+    Thread-safe token bucket: sustained `rate` requests/sec, bursts of `burst`.
+
+    acquire() reserves a token and sleeps (outside the lock) until it is due,
+    so concurrent callers queue up fairly without a polling loop.
+    """
+
+    MIN_RATE = 0.5
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+    def slow_down(self) -> None:
+        """Halve the rate after the host kept answering 429."""
+        with self._lock:
+            self.rate = max(self.rate / 2, self.MIN_RATE)
+        logger.warning("Rate limited; slowing down to %.2f req/s.", self.rate)
+
+
+# Per-host client-side rate limits. BallDontLie's limit depends on the account
+# tier; 5 req/s matches the old fixed 0.2s pause between pages.
+_BUCKETS: Dict[str, _TokenBucket] = {
+    "api.balldontlie.io": _TokenBucket(rate=5, burst=5),
+    "site.api.espn.com": _TokenBucket(rate=10, burst=10),
+}
+
 
 # -----------------------------
 # Helpers
 # -----------------------------------------
 
+def _json_loads(raw: bytes) -> Any:
+    """Decode JSON bytes, using orjson (C parser) when available."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+
+@lru_cache(maxsize=1)
 def _balldontlie_headers() -> Dict[str, str]:
     """
     Build headers for BallDontLie API using env var BALLDONTLIE_API_KEY.
 
+    Read once per process; every batch worker reuses the same dict.
+
     401s from the API usually mean:
       - Missing/incorrect API key, OR
       - Your account tier does not include the endpoint (e.g., /stats).
     """
     api_key = os.getenv("BALLDONTLIE_API_KEY")
     if not api_key:
-        print("BALLDONTLIE_API_KEY not set; skipping game log fetch.")
+        logger.warning("BALLDONTLIE_API_KEY not set; skipping game log fetch.")
         return {}
 
     # Per BallDontLie docs: header must be Authorization: YOUR_API_KEY
@@ -41,37 +168,171 @@ def _balldontlie_headers() -> Dict[str, str]:
     return {"Authorization": api_key}
 
 
+def _is_rate_limited(e: requests.exceptions.RetryError) -> bool:
+    """True if the adapter's retries ran out on 429s (not 5xx)."""
+    # urllib3 raises MaxRetryError(reason=ResponseError("too many 429 error
+    # responses")) when the status retries are exhausted
+    reason = getattr(e.args[0] if e.args else None, "reason", None)
+    return isinstance(reason, ResponseError) and "429" in str(reason)
+
+
 def _safe_get(url: str, *, params: Optional[Dict[str, Any]] = None,
               headers: Optional[Dict[str, str]] = None,
-              timeout: int = 30) -> Optional[requests.Response]:
-    """Simple wrapper that logs and swallows errors instead of crashing."""
+              timeout: int = 30,
+              allow_status: Tuple[int, ...] = (),
+              reraise: Tuple[type, ...] = ()) -> Optional[requests.Response]:
+    """
+    Simple wrapper that logs and swallows errors instead of crashing.
+
+    Responses whose status is in allow_status are returned as-is instead of
+    being treated as errors, for callers that give them meaning (e.g. 404).
+    Exceptions of the types in reraise propagate instead of being swallowed.
+    Requests to hosts in _BUCKETS are paced by that host's token bucket.
+    """
+    bucket = _BUCKETS.get(urlsplit(url).netloc)
     try:
-        resp = requests.get(url, params=params, headers=headers, timeout=timeout)
+        if bucket is not None:
+            bucket.acquire()
+        resp = _SESSION.get(url, params=params, headers=headers, timeout=timeout)
+        if resp.status_code in allow_status:
+            return resp
         resp.raise_for_status()
         return resp
+    except reraise:
+        raise
     except requests.HTTPError as e:
-        print(f"HTTP error for {url}: {e}")
+        logger.warning("HTTP error for %s: %s", url, e)
+    except requests.exceptions.RetryError as e:
+        # The adapter gave up after repeated 429/5xx. Only 429s mean we're
+        # going too fast; back off for the rest of the run in that case.
+        if bucket is not None and _is_rate_limited(e):
+            bucket.slow_down()
+        logger.warning("Retries exhausted for %s: %s", url, e)
     except Exception as e:
-        print(f"Error requesting {url}: {e}")
+        logger.warning("Error requesting %s: %s", url, e)
     return None
 
 
+def _cache_path(name: str) -> str:
+    return os.path.join(CACHE_DIR, name)
+
+
+def _read_cache(path: str, ttl: Optional[float]) -> Optional[Any]:
+    """
+    Return cached JSON at path if it is younger than ttl seconds, else None.
+
+    ttl=None skips the age check (used for stale-on-failure fallbacks).
+    """
+    try:
+        if ttl is not None and time.time() - os.path.getmtime(path) >= ttl:
+            return None
+        with open(path, "rb") as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(path: str, data: Any) -> None:
+    """Atomically write data as JSON to path (write to tmp file, then rename)."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_json_dumps(data))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Failed to write cache %s: %s", path, e)
+
+
+def _cached_get(url: str, ttl: float, cache_name: str,
+                stale_ok: bool = True) -> Optional[Any]:
+    """
+    GET url as JSON through a local file cache.
+
+    Fresh cache (younger than ttl) is returned without a request. Otherwise
+    we revalidate with If-None-Match / If-Modified-Since from the last
+    response, so an unchanged resource costs an empty 304 instead of a full
+    download + parse. If the fetch fails, fall back to the stale cache so
+    flaky upstreams don't blank out downstream data, unless stale_ok is
+    False (data that must be current, where a failure should stay visible).
+    Returns None only if both the fetch and the cache come up empty.
+    """
+    path = _cache_path(cache_name)
+    data = _read_cache(path, ttl)
+    if data is not None:
+        return data
+
+    meta_path = f"{path}.meta"
+    headers: Dict[str, str] = {}
+    if os.path.exists(path):
+        validators = _read_cache(meta_path, None) or {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    resp = _safe_get(url, headers=headers or None)
+    if resp is not None and resp.status_code == 304:
+        data = _read_cache(path, None)
+        if data is not None:
+            os.utime(path)  # restart the TTL
+            return data
+        resp = _safe_get(url)
+
+    if resp is not None:
+        try:
+            data = _json_loads(resp.content)
+        except ValueError as e:
+            # e.g. an HTML error page served with a 200; treat it as a failed fetch
+            logger.warning("Bad JSON from %s: %s", url, e)
+        else:
+            _write_cache(path, data)
+            _write_cache(meta_path, {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+            })
+            return data
+
+    if not stale_ok:
+        return None
+    data = _read_cache(path, None)
+    if data is not None:
+        logger.warning("Using stale cache for %s (stale fallback).", url)
+    return data
+
+
 # -----------------------------
 # Sleeper league / rosters / transactions / players
 # -----------------------------
 
-def fetch_sleeper_league_metadata() -> Dict[str, Any]:
-    """Return basic league metadata + users."""
-    league_url = f"{SLEEPER_BASE}/league/{SLEEPER_LEAGUE_ID}"
-    users_url = f"{SLEEPER_BASE}/league/{SLEEPER_LEAGUE_ID}/users"
+def _sleeper_fetch_failed(what: str) -> RuntimeError:
+    return RuntimeError(f"Failed to fetch Sleeper data: {what}")
 
-    league_resp = _safe_get(league_url)
-    users_resp = _safe_get(users_url)
 
-    league = league_resp.json() if league_resp is not None else {}
-    users = users_resp.json() if users_resp is not None else []
+def fetch_sleeper_league_metadata(league_id: str = SLEEPER_LEAGUE_ID,
+                                  raise_on_error: bool = False) -> Dict[str, Any]:
+    """
+    Return basic league metadata + users.
 
-    print(f"Fetched Sleeper league metadata (league: {bool(league)}, users: {len(users)})")
+    With raise_on_error, a failed fetch raises RuntimeError instead of
+    coming back empty (same for the other Sleeper fetchers).
+    """
+    league_url = f"{SLEEPER_BASE}/league/{league_id}"
+    users_url = f"{SLEEPER_BASE}/league/{league_id}/users"
+
+    # ttl=0: always revalidate, but let unchanged responses come back as 304s.
+    # No stale fallback: an outage must not silently republish old league data.
+    league = _cached_get(league_url, 0, f"sleeper_league_{league_id}.json", stale_ok=False)
+    users = _cached_get(users_url, 0, f"sleeper_users_{league_id}.json", stale_ok=False)
+    if raise_on_error:
+        if not league:
+            raise _sleeper_fetch_failed("no league info returned")
+        if users is None:
+            raise _sleeper_fetch_failed("no league users returned")
+    league = league or {}
+    users = users or []
+
+    logger.info("Fetched Sleeper league metadata (league: %s, users: %d)", bool(league), len(users))
 
     return {
         "league": league,
@@ -79,49 +340,126 @@ def fetch_sleeper_league_metadata() -> Dict[str, Any]:
     }
 
 
-def fetch_sleeper_rosters() -> List[Dict[str, Any]]:
+def fetch_sleeper_rosters(league_id: str = SLEEPER_LEAGUE_ID,
+                          raise_on_error: bool = False) -> List[Dict[str, Any]]:
     """Return list of Sleeper rosters for the league."""
-    url = f"{SLEEPER_BASE}/league/{SLEEPER_LEAGUE_ID}/rosters"
-    resp = _safe_get(url)
-    rosters = resp.json() if resp is not None else []
-    print(f"Fetched {len(rosters)} Sleeper rosters.")
+    url = f"{SLEEPER_BASE}/league/{league_id}/rosters"
+    rosters = _cached_get(url, 0, f"sleeper_rosters_{league_id}.json", stale_ok=False)
+    if rosters is None:
+        if raise_on_error:
+            raise _sleeper_fetch_failed("no rosters returned")
+        rosters = []
+    logger.info("Fetched %d Sleeper rosters.", len(rosters))
     return rosters
 
 
-def fetch_sleeper_players() -> Dict[str, Any]:
+@lru_cache(maxsize=1)
+def _load_sleeper_players() -> Dict[str, Any]:
+    # Raises on failure: lru_cache doesn't cache exceptions, so a failed
+    # fetch is retried on the next call instead of memoizing an empty pool
+    url = f"{SLEEPER_BASE}/players/nba"
+    players = _cached_get(url, SLEEPER_PLAYERS_CACHE_TTL, "sleeper_players.json")
+    if not players:
+        raise _sleeper_fetch_failed("no players returned")
+    logger.info("Fetched %d Sleeper players.", len(players))
+    return players
+
+
+def fetch_sleeper_players(raise_on_error: bool = False) -> Dict[str, Any]:
     """
     Return the full Sleeper NBA player pool.
 
-    This is a big dict keyed by Sleeper player_id.
+    This is a big dict keyed by Sleeper player_id. It is memoized in-process
+    and cached on disk for SLEEPER_PLAYERS_CACHE_TTL, since the payload is
+    several MB and only changes a few times a day at most.
     """
-    url = f"{SLEEPER_BASE}/players/nba"
-    resp = _safe_get(url)
-    players = resp.json() if resp is not None else {}
-    print(f"Fetched {len(players)} Sleeper players.")
-    return players
+    try:
+        return _load_sleeper_players()
+    except RuntimeError as e:
+        if raise_on_error:
+            raise
+        logger.warning("%s", e)
+        return {}
 
 
-def fetch_sleeper_transactions(max_weeks: int = 30) -> List[Dict[str, Any]]:
+def _fetch_sleeper_transactions_week(url_prefix: str, week: int,
+                                     raise_on_error: bool = False) -> Optional[List[Dict[str, Any]]]:
     """
-    Fetch league transactions for weeks 1..max_weeks.
+    Return one week's transactions, or None if Sleeper 404s (week out of range).
 
-    Sleeper's NBA "weeks" are just internal periods; this mirrors what we
-    saw in your logs (1–30).
+    An HTTP error for a single week is logged and the week skipped. With
+    raise_on_error, connection errors (Sleeper unreachable) are raised as
+    RuntimeError instead.
     """
-    all_tx: List[Dict[str, Any]] = []
+    reraise = (requests.ConnectionError, requests.Timeout) if raise_on_error else ()
+    try:
+        resp = _safe_get(url_prefix + str(week), allow_status=(404,), reraise=reraise)
+    except reraise as e:
+        raise _sleeper_fetch_failed(f"transactions for week {week}: {e}") from e
+    if resp is None:
+        return []
+    if resp.status_code == 404:
+        return None
+    try:
+        return _json_loads(resp.content) or []
+    except ValueError as e:
+        logger.warning("Bad JSON for transactions week %d: %s", week, e)
+        return []
 
-    for week in range(1, max_weeks + 1):
-        url = f"{SLEEPER_BASE}/league/{SLEEPER_LEAGUE_ID}/transactions/{week}"
-        resp = _safe_get(url)
-        if resp is None:
-            continue
 
-        week_tx = resp.json() or []
-        if week_tx:
-            print(f"Week {week}: fetched {len(week_tx)} transactions.")
-            all_tx.extend(week_tx)
+def _current_leg(league: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Sleeper's current leg (week) from a league payload, if present."""
+    try:
+        return int((league or {}).get("settings", {})["leg"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def iter_sleeper_transactions(league_id: str = SLEEPER_LEAGUE_ID,
+                              max_weeks: int = 30,
+                              league: Optional[Dict[str, Any]] = None,
+                              raise_on_error: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Yield league transactions for weeks 1..max_weeks, in week order.
 
-    print(f"Fetched {len(all_tx)} total transactions.")
+    Sleeper's NBA "weeks" are just internal periods; this mirrors what we
+    saw in your logs (1–30). If the already-fetched league payload is
+    passed, the scan stops at its current leg (settings.leg), since later
+    weeks can't have transactions yet.
+
+    Weeks are independent, so they are all requested concurrently over the
+    shared session; each week's transactions are yielded as soon as it (and
+    every earlier week) has arrived. The first week that 404s ends the scan
+    and any requests for later weeks that haven't started are cancelled.
+    """
+    # Only the trailing week number varies between requests
+    fetch_week = partial(_fetch_sleeper_transactions_week,
+                         f"{SLEEPER_BASE}/league/{league_id}/transactions/",
+                         raise_on_error=raise_on_error)
+    leg = _current_leg(league)
+    if leg is not None:
+        max_weeks = min(max_weeks, leg)
+    weeks = range(1, max_weeks + 1)
+    with ThreadPoolExecutor(max_workers=TRANSACTION_WORKERS) as pool:
+        futures = [pool.submit(fetch_week, week) for week in weeks]
+        for i, (week, fut) in enumerate(zip(weeks, futures)):
+            week_tx = fut.result()
+            if week_tx is None:
+                for pending in futures[i + 1:]:
+                    pending.cancel()
+                break
+            if week_tx:
+                logger.info("Week %d: fetched %d transactions.", week, len(week_tx))
+                yield from week_tx
+
+
+def fetch_sleeper_transactions(league_id: str = SLEEPER_LEAGUE_ID,
+                               max_weeks: int = 30,
+                               league: Optional[Dict[str, Any]] = None,
+                               raise_on_error: bool = False) -> List[Dict[str, Any]]:
+    """List form of iter_sleeper_transactions."""
+    all_tx = list(iter_sleeper_transactions(league_id, max_weeks, league, raise_on_error))
+    logger.info("Fetched %d total transactions.", len(all_tx))
     return all_tx
 
 
@@ -139,21 +477,36 @@ def fetch_sleeper_nba_metadata() -> Dict[str, Any]:
 # BallDontLie NBA game logs (incremental)
 # -----------------------------
 
-def fetch_nba_game_logs_for_date(date_obj: dt.date) -> List[Dict[str, Any]]:
+class BallDontLieAuthError(RuntimeError):
+    """BallDontLie answered 401: bad API key, or the account tier lacks /stats."""
+
+
+def fetch_nba_game_logs_for_dates(dates: List[dt.date],
+                                  failed_dates: Optional[List[dt.date]] = None) -> List[Dict[str, Any]]:
     """
-    Fetch all player game logs for a single date via BallDontLie /v1/stats.
+    Fetch all player game logs for a batch of dates via BallDontLie /v1/stats.
+
+    /stats accepts repeated dates[] params, so the whole batch is a single
+    query; requests serializes the list as repeated keys. If the API rejects
+    the batched form (400), the batch is retried one date at a time.
+
+    A batch is all-or-nothing: if any page fails (after the session's own
+    retries), its partial logs are dropped and, when failed_dates is given,
+    the batch's dates are appended to it so the caller can retry them later.
+    A 401 raises BallDontLieAuthError instead, since retrying won't help.
 
     Uses cursor-based pagination as documented by BallDontLie:
       - per_page up to 100
       - meta.next_cursor for subsequent pages
     """
     headers = _balldontlie_headers()
-    if not headers:
+    if not headers or not dates:
         # Already logged missing API key.
         return []
 
-    date_str = date_obj.isoformat()
-    print(f"Fetching logs for {date_str}")
+    date_strs = [d.isoformat() for d in dates]
+    date_str = date_strs[0] if len(date_strs) == 1 else f"{date_strs[0]}..{date_strs[-1]}"
+    logger.info("Fetching logs for %s", date_str)
 
     url = f"{BALLDONTLIE_BASE}/stats"
     all_logs: List[Dict[str, Any]] = []
@@ -161,31 +514,41 @@ def fetch_nba_game_logs_for_date(date_obj: dt.date) -> List[Dict[str, Any]]:
 
     while True:
         params: Dict[str, Any] = {
-            "dates[]": date_str,
+            "dates[]": date_strs,
             "per_page": 100,
         }
         if cursor is not None:
             params["cursor"] = cursor
 
-        resp = _safe_get(url, params=params, headers=headers)
+        # Let a 400 on the first batched page through so we can fall back
+        batched_first_page = cursor is None and len(date_strs) > 1
+        resp = _safe_get(url, params=params, headers=headers,
+                         allow_status=(400, 401) if batched_first_page else (401,))
+        if batched_first_page and resp is not None and resp.status_code == 400:
+            logger.warning("BallDontLie rejected batched dates %s; fetching day by day.", date_str)
+            return [log for d in dates for log in fetch_nba_game_logs_for_date(d, failed_dates)]
+        if resp is not None and resp.status_code == 401:
+            # Bad key or account tier: retrying next run won't help, so these
+            # dates are not reported as failed; the caller decides what to do
+            raise BallDontLieAuthError(
+                "Got 401 from BallDontLie. "
+                "Make sure BALLDONTLIE_API_KEY is set AND your account tier "
+                "includes the /stats endpoint (game player stats)."
+            )
         if resp is None:
-            # Could be network error, HTTP error, etc.
-            # If it's HTTP 401 specifically, log once and bail out for the entire date.
-            try:
-                # If we had a response but it raised on .raise_for_status(), _safe_get
-                # would already have printed it. To be extra explicit:
-                if resp is not None and resp.status_code == 401:
-                    print(
-                        "Got 401 from BallDontLie. "
-                        "Make sure BALLDONTLIE_API_KEY is set AND your account tier "
-                        "includes the /stats endpoint (game player stats)."
-                    )
-            except Exception:
-                pass
+            # Network error, 5xx after retries, etc.; worth retrying next run
+            return _game_log_batch_failed(dates, date_str, failed_dates)
+
+        try:
+            data = _json_loads(resp.content)
+        except ValueError as e:
+            # One bad page shouldn't sink the other batches
+            logger.warning("Bad JSON from BallDontLie for %s: %s", date_str, e)
+            return _game_log_batch_failed(dates, date_str, failed_dates)
+        logs = data.get("data")
+        if not logs:
+            # Off-days and exhausted cursors come back empty; nothing more to page
             break
-
-        data = resp.json()
-        logs = data.get("data", [])
         all_logs.extend(logs)
 
         meta = data.get("meta", {}) or {}
@@ -193,33 +556,96 @@ def fetch_nba_game_logs_for_date(date_obj: dt.date) -> List[Dict[str, Any]]:
         if not cursor:
             break
 
-        # Small pause to be nice to the API
-        time.sleep(0.2)
-
-    print(f"Fetched {len(all_logs)} logs for {date_str}")
+    logger.info("Fetched %d logs for %s", len(all_logs), date_str)
     return all_logs
 
 
-def fetch_nba_game_logs_since(start_date: dt.date,
-                              end_date: Optional[dt.date] = None) -> List[Dict[str, Any]]:
+def _game_log_batch_failed(dates: List[dt.date], date_str: str,
+                           failed_dates: Optional[List[dt.date]]) -> List[Dict[str, Any]]:
+    logger.warning("Giving up on game logs for %s for this run.", date_str)
+    if failed_dates is not None:
+        failed_dates.extend(dates)
+    return []
+
+
+def fetch_nba_game_logs_for_date(date_obj: dt.date,
+                                 failed_dates: Optional[List[dt.date]] = None) -> List[Dict[str, Any]]:
+    """Fetch all player game logs for a single date via BallDontLie /v1/stats."""
+    return fetch_nba_game_logs_for_dates([date_obj], failed_dates)
+
+
+def iter_nba_game_logs_since(start_date: dt.date,
+                             end_date: Optional[dt.date] = None,
+                             scheduled_dates: Optional[Set[str]] = None,
+                             retry_dates: Iterable[dt.date] = (),
+                             failed_dates: Optional[List[dt.date]] = None) -> Iterator[Dict[str, Any]]:
     """
-    Fetch player game logs from BallDontLie from start_date (inclusive)
+    Yield player game logs from BallDontLie from start_date (inclusive)
     up to end_date (inclusive, default = today).
 
-    Returns a flat list of BallDontLie stat objects.
+    If scheduled_dates (ISO YYYY-MM-DD strings) is given, dates inside the
+    schedule's range with no scheduled games are skipped; dates outside
+    that range are still fetched, in case the schedule is incomplete.
+
+    retry_dates (typically dates that failed on a previous run) are fetched
+    as well, even if they fall before start_date. Dates whose batch fails
+    are appended to failed_dates, if given. Raises BallDontLieAuthError if
+    BallDontLie rejects the API key.
+
+    The range is split into batches of GAME_LOG_DATES_PER_REQUEST dates,
+    each fetched as one multi-date query. Batches run concurrently; each
+    still walks its own cursor pages serially. Batches are yielded in date
+    order as they complete, so consumers can start before the backfill ends.
+
+    Yields BallDontLie stat objects.
     """
     if end_date is None:
         end_date = dt.date.today()
 
-    all_logs: List[Dict[str, Any]] = []
-    cur = start_date
+    retry_dates = set(retry_dates)
+    if start_date > end_date and not retry_dates:
+        logger.info("Game logs already up to date.")
+        return
+
+    if not _balldontlie_headers():
+        # Already logged missing API key.
+        return
+
+    n_days = max((end_date - start_date).days + 1, 0)
+    dates = [start_date + dt.timedelta(days=i) for i in range(n_days)]
+    if scheduled_dates:
+        first, last = min(scheduled_dates), max(scheduled_dates)
+        dates = [
+            d for d in dates
+            if d.isoformat() in scheduled_dates or not first <= d.isoformat() <= last
+        ]
+    if retry_dates:
+        logger.info("Retrying game logs for %d previously failed dates.", len(retry_dates))
+        dates = sorted(retry_dates.union(dates))
+    if not dates:
+        logger.info("No scheduled games between %s and %s.", start_date, end_date)
+        return
+
+    batches = [
+        dates[i:i + GAME_LOG_DATES_PER_REQUEST]
+        for i in range(0, len(dates), GAME_LOG_DATES_PER_REQUEST)
+    ]
+
+    with ThreadPoolExecutor(max_workers=GAME_LOG_WORKERS) as pool:
+        fetch_batch = partial(fetch_nba_game_logs_for_dates, failed_dates=failed_dates)
+        for batch_logs in pool.map(fetch_batch, batches):
+            yield from batch_logs
 
-    while cur <= end_date:
-        day_logs = fetch_nba_game_logs_for_date(cur)
-        all_logs.extend(day_logs)
-        cur += dt.timedelta(days=1)
 
-    print(f"Fetched {len(all_logs)} new game logs in total.")
+def fetch_nba_game_logs_since(start_date: dt.date,
+                              end_date: Optional[dt.date] = None,
+                              scheduled_dates: Optional[Set[str]] = None,
+                              retry_dates: Iterable[dt.date] = (),
+                              failed_dates: Optional[List[dt.date]] = None) -> List[Dict[str, Any]]:
+    """List form of iter_nba_game_logs_since."""
+    all_logs = list(iter_nba_game_logs_since(start_date, end_date, scheduled_dates,
+                                             retry_dates, failed_dates))
+    logger.info("Fetched %d new game logs in total.", len(all_logs))
     return all_logs
 
 
@@ -231,8 +657,9 @@ def fetch_nba_schedule(season_year: Optional[int] = None) -> Dict[str, Any]:
     """
     Fetch NBA schedule from data.nba.net.
 
-    If SSL issues occur on your VPS, this function will simply log and
-    return an empty dict (so the rest of the pipeline still works).
+    Cached for NBA_SCHEDULE_CACHE_TTL. If SSL issues occur on your VPS,
+    this falls back to the last cached copy, or logs and returns an empty
+    dict (so the rest of the pipeline still works).
     """
     if season_year is None:
         today = dt.date.today()
@@ -240,17 +667,14 @@ def fetch_nba_schedule(season_year: Optional[int] = None) -> Dict[str, Any]:
 
     url = NBA_SCHEDULE_URL_TEMPLATE.format(season=season_year)
 
-    try:
-        # If this still fails due to SSL on your VPS, we catch it.
-        resp = requests.get(url, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-        print(f"Fetched NBA schedule for season {season_year}.")
-        return data
-    except Exception as e:
-        print(f"Failed to fetch NBA schedule: {e}")
+    data = _cached_get(url, NBA_SCHEDULE_CACHE_TTL, f"nba_schedule_{season_year}.json")
+    if data is None:
+        logger.warning("Failed to fetch NBA schedule.")
         return {}
 
+    logger.info("Fetched NBA schedule for season %s.", season_year)
+    return data
+
 
 # -----------------------------
 # ESPN injuries
@@ -264,14 +688,16 @@ def fetch_espn_injuries() -> Dict[str, Any]:
     update_nba_historical.py can decide how to parse it.
 
     ESPN's structure can change, so this is safer than overfitting.
+
+    Cached for ESPN_INJURIES_CACHE_TTL, with the last good payload used as a
+    fallback when ESPN is down.
     """
-    resp = _safe_get(ESPN_INJURIES_URL)
-    if resp is None:
-        print("Failed to fetch ESPN injuries.")
+    data = _cached_get(ESPN_INJURIES_URL, ESPN_INJURIES_CACHE_TTL, "espn_injuries.json")
+    if data is None:
+        logger.warning("Failed to fetch ESPN injuries.")
         return {}
 
-    data = resp.json()
     # For logging/debugging only
     total_items = len(data.get("injuries", [])) if isinstance(data.get("injuries", []), list) else 0
-    print(f"Fetched ESPN injuries payload (top-level 'injuries' count: {total_items}).")
+    logger.info("Fetched ESPN injuries payload (top-level 'injuries' count: %d).", total_items)
     return data
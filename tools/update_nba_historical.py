@@ -1,9 +1,23 @@
 import json
+import logging
 import os
-from datetime import datetime, date, timedelta
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta, timezone
 from typing import Any, Dict, List
 
-import requests
+# fetch_data.py at the repo root is the single HTTP/fetch layer (shared
+# session, caches, rate limits); make it importable when this script is run
+# as `python3 tools/update_nba_historical.py`.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fetch_data  # noqa: E402
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used if orjson isn't installed
+    orjson = None
+
+logger = logging.getLogger(__name__)
 
 # ================================
 # CONFIG – EDIT THIS
@@ -27,13 +41,15 @@ def load_existing_bundle() -> Dict[str, Any]:
             "meta": {
                 "last_updated": None,
                 "last_game_date": None,
+                "last_cursor_date": None,
+                "pending_dates": [],
             },
             "league": {
                 "info": {},
                 "users": {},
                 "rosters": [],
                 "transactions": [],
-                "players": {},
+                "players_ref": "nba.players",
             },
             "nba": {
                 "games": [],
@@ -44,143 +60,144 @@ def load_existing_bundle() -> Dict[str, Any]:
             },
         }
 
-    with open(BUNDLE_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(BUNDLE_PATH, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
 
 def save_bundle(bundle: Dict[str, Any]) -> None:
     os.makedirs(os.path.dirname(BUNDLE_PATH), exist_ok=True)
-    with open(BUNDLE_PATH, "w", encoding="utf-8") as f:
-        json.dump(bundle, f, indent=2, sort_keys=False)
-    print(f"Bundle saved to {BUNDLE_PATH}")
+    # Write to a tmp file and rename over the bundle, so a crash mid-write
+    # can't leave a truncated bundle that forces a full-season backfill
+    tmp = BUNDLE_PATH + ".tmp"
+    # Compact output: the bundle is multi-MB, and indenting roughly doubles
+    # both its size and the encode time
+    if orjson is not None:
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(bundle))
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(bundle, f, separators=(",", ":"), sort_keys=False)
+    os.replace(tmp, BUNDLE_PATH)
+    logger.info("Bundle saved to %s", BUNDLE_PATH)
+
+
+def _is_iso_date(value: Any) -> bool:
+    """True for a valid YYYY-MM-DD string."""
+    if not (isinstance(value, str) and len(value) == 10 and value[4] == "-"):
+        return False
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
 
 
 def get_last_game_date(bundle: Dict[str, Any]) -> date:
     games = bundle.get("nba", {}).get("games", [])
-    dates: List[date] = []
-    for g in games:
-        d = g.get("game_date")
-        if not d:
-            continue
-        try:
-            dates.append(datetime.strptime(d, "%Y-%m-%d").date())
-        except ValueError:
-            continue
-    if not dates:
+    # YYYY-MM-DD strings sort chronologically, so take the max as text and
+    # only parse that one. Skip malformed values first: letters sort above
+    # digits, so a single bad row would otherwise win the max.
+    latest = max((d for d in {g.get("game_date") for g in games} if _is_iso_date(d)), default=None)
+    if latest is None:
         # fallback: early season start
         return date(NBA_SEASON_YEAR, 10, 1)
-    return max(dates)
-
-
-def merge_game_logs(bundle: Dict[str, Any], new_games: List[Dict[str, Any]]) -> None:
-    existing_games = bundle["nba"].get("games", [])
-    existing_ids = {g.get("game_id") for g in existing_games if g.get("game_id")}
-
-    deduped = [g for g in new_games if g.get("game_id") not in existing_ids]
-    if deduped:
-        print(f"Merging {len(deduped)} new game logs.")
-    else:
-        print("No new game logs to merge.")
-
-    bundle["nba"]["games"] = existing_games + deduped
-
-
-# ================================
-# SLEEPER FETCHES
-# ================================
-SLEEPER_BASE = "https://api.sleeper.app/v1"
-
+    return date.fromisoformat(latest)
 
-def _get_json(url: str) -> Any:
-    print(f"GET {url}")
-    resp = requests.get(url, timeout=15)
-    resp.raise_for_status()
-    return resp.json()
 
+def get_fetch_start_date(bundle: Dict[str, Any]) -> date:
+    """
+    First date whose game logs still need fetching.
 
-def fetch_sleeper_league_info(league_id: str) -> Dict[str, Any]:
-    return _get_json(f"{SLEEPER_BASE}/league/{league_id}")
-
+    Normally the day after the last stored game, but meta.last_cursor_date
+    (the last date fully fetched) lets off-days and game-less stretches be
+    skipped instead of re-queried on every run.
+    """
+    last = get_last_game_date(bundle)
+    cursor = bundle.get("meta", {}).get("last_cursor_date")
+    if cursor:
+        try:
+            last = max(last, date.fromisoformat(cursor))
+        except ValueError:
+            pass
+    return last + timedelta(days=1)
 
-def fetch_sleeper_rosters(league_id: str) -> List[Dict[str, Any]]:
-    return _get_json(f"{SLEEPER_BASE}/league/{league_id}/rosters")
 
+def get_pending_dates(bundle: Dict[str, Any]) -> List[date]:
+    """Dates whose game-log fetch failed on a previous run (meta.pending_dates)."""
+    pending: List[date] = []
+    for d in bundle.get("meta", {}).get("pending_dates") or []:
+        try:
+            pending.append(date.fromisoformat(d))
+        except ValueError:
+            pass
+    return pending
 
-def fetch_sleeper_users(league_id: str) -> List[Dict[str, Any]]:
-    return _get_json(f"{SLEEPER_BASE}/league/{league_id}/users")
 
+def merge_game_logs(bundle: Dict[str, Any], new_games: List[Dict[str, Any]]) -> None:
+    existing_games = bundle["nba"].setdefault("games", [])
+    existing_ids = {g.get("game_id") for g in existing_games if g.get("game_id")}
 
-def fetch_sleeper_players() -> Dict[str, Any]:
-    # Sleeper NBA player pool
-    return _get_json(f"{SLEEPER_BASE}/players/nba")
+    deduped = [g for g in new_games if g.get("game_id") not in existing_ids]
+    if deduped:
+        logger.info("Merging %d new game logs.", len(deduped))
+    else:
+        logger.info("No new game logs to merge.")
 
+    # Extend in place rather than building a copy of the whole history
+    existing_games.extend(deduped)
 
-def fetch_sleeper_transactions(league_id: str, max_weeks: int = 30) -> List[Dict[str, Any]]:
-    all_tx: List[Dict[str, Any]] = []
-    for week in range(1, max_weeks + 1):
-        url = f"{SLEEPER_BASE}/league/{league_id}/transactions/{week}"
-        try:
-            tx_week = _get_json(url)
-        except requests.HTTPError as e:
-            # If a week is out of range, Sleeper usually returns 404; just stop there
-            if e.response is not None and e.response.status_code == 404:
-                break
-            else:
-                print(f"Error fetching transactions for week {week}: {e}")
-                continue
-        if not tx_week:
-            continue
-        all_tx.extend(tx_week)
-    print(f"Fetched {len(all_tx)} total transactions.")
-    return all_tx
+    # Keep meta.last_game_date current so callers don't have to rescan games.
+    # Same validation as get_last_game_date: a non-ISO value would win a
+    # plain string max.
+    new_dates = {g.get("game_date") for g in deduped}
+    new_dates = {d for d in new_dates if _is_iso_date(d)}
+    if new_dates:
+        meta = bundle.setdefault("meta", {})
+        current = meta.get("last_game_date")
+        if _is_iso_date(current):
+            new_dates.add(current)
+        meta["last_game_date"] = max(new_dates)
 
 
 # ================================
 # ESPN INJURIES
 # ================================
-def fetch_espn_injuries() -> List[Dict[str, Any]]:
-    url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/injuries"
-    try:
-        data = _get_json(url)
-    except Exception as e:
-        print(f"Failed to fetch ESPN injuries: {e}")
-        return []
-
-    injuries: List[Dict[str, Any]] = []
-    for league in data.get("injuries", []):
-        for team in league.get("teams", []):
-            team_info = team.get("team", {})
-            team_abbrev = team_info.get("abbreviation") or team_info.get("abbrev")
-            for item in team.get("injuries", []):
-                player = item.get("athlete", {}) or {}
-                notes = item.get("details") or item.get("comment") or ""
-                status = item.get("status") or {}
-                injuries.append(
-                    {
-                        "player_id": player.get("id"),
-                        "name": player.get("displayName"),
-                        "team": team_abbrev or "N/A",
-                        "status": status.get("type", {}).get("name") or status.get("description"),
-                        "detail": notes,
-                        "source": "ESPN",
-                    }
-                )
-    print(f"Parsed {len(injuries)} ESPN injuries.")
+def _parse_espn_injury(item: Dict[str, Any], team_abbrev: str) -> Dict[str, Any]:
+    player = item.get("athlete") or {}
+    status = item.get("status") or {}
+    return {
+        "player_id": player.get("id"),
+        "name": player.get("displayName"),
+        "team": team_abbrev,
+        "status": status.get("type", {}).get("name") or status.get("description"),
+        "detail": item.get("details") or item.get("comment") or "",
+        "source": "ESPN",
+    }
+
+
+def _team_abbrev(team: Dict[str, Any]) -> str:
+    team_info = team.get("team", {})
+    return team_info.get("abbreviation") or team_info.get("abbrev") or "N/A"
+
+
+def parse_espn_injuries(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Records stay plain dicts: they go straight into the JSON bundle
+    injuries = [
+        _parse_espn_injury(item, team_abbrev)
+        for league in data.get("injuries", [])
+        for team in league.get("teams", [])
+        for team_abbrev in (_team_abbrev(team),)
+        for item in team.get("injuries", [])
+    ]
+    logger.info("Parsed %d ESPN injuries.", len(injuries))
     return injuries
 
 
 # ================================
 # NBA SCHEDULE VIA CDN
 # ================================
-def fetch_nba_schedule(season_year: int) -> List[Dict[str, Any]]:
-    # NBA data API – schedule JSON
-    url = f"https://data.nba.net/prod/v2/{season_year}/schedule.json"
-    try:
-        data = _get_json(url)
-    except Exception as e:
-        print(f"Failed to fetch NBA schedule: {e}")
-        return []
-
+def parse_nba_schedule(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     games = data.get("league", {}).get("standard", [])
     schedule: List[Dict[str, Any]] = []
 
@@ -201,70 +218,39 @@ def fetch_nba_schedule(season_year: int) -> List[Dict[str, Any]]:
             }
         )
 
-    print(f"Fetched {len(schedule)} NBA schedule entries.")
+    logger.info("Parsed %d NBA schedule entries.", len(schedule))
     return schedule
 
 
 # ================================
 # GAME LOGS (BallDontLie stub)
 # ================================
-def fetch_nba_game_logs_since(start_date: date) -> List[Dict[str, Any]]:
-    """
-    Incremental game-logs fetch using BallDontLie v2.
-    Requires BALLDONTLIE_API_KEY in environment.
-    If not set or request fails, returns [] but does NOT raise.
-    """
-    api_key = os.getenv("BALLDONTLIE_API_KEY")
-    if not api_key:
-        print("BALLDONTLIE_API_KEY not set; skipping game log fetch.")
-        return []
-
-    headers = {"Authorization": f"Bearer {api_key}"}
-    base_url = "https://api.balldontlie.io/v1/stats"
-
-    today = date.today()
-    cur = start_date
-    all_logs: List[Dict[str, Any]] = []
-
-    while cur <= today:
-        date_str = cur.strftime("%Y-%m-%d")
-        params = {"dates[]": date_str, "per_page": 100}
-        try:
-            print(f"Fetching logs for {date_str}")
-            resp = requests.get(base_url, headers=headers, params=params, timeout=20)
-            resp.raise_for_status()
-            data = resp.json()
-        except Exception as e:
-            print(f"Failed to fetch logs for {date_str}: {e}")
-            cur += timedelta(days=1)
-            continue
-
-        for stat in data.get("data", []):
-            game = stat.get("game", {})
-            game_id = game.get("id")
-            game_date = game.get("date", "")[:10]  # ISO string
-
-            all_logs.append(
-                {
-                    "game_id": str(game_id),
-                    "game_date": game_date,
-                    "player_id": str(stat.get("player", {}).get("id")),
-                    "team_id": str(stat.get("team", {}).get("id")),
-                    "pts": stat.get("pts"),
-                    "reb": stat.get("reb"),
-                    "ast": stat.get("ast"),
-                    "blk": stat.get("blk"),
-                    "stl": stat.get("stl"),
-                    "fg3m": stat.get("fg3m"),
-                    "min": stat.get("min"),
-                    "raw": stat,  # keep full object for now
-                }
-            )
-
-        cur += timedelta(days=1)
-
-    print(f"Fetched {len(all_logs)} new game logs.")
-    return all_logs
+# Box-score fields copied as-is from each BallDontLie stat row
+GAME_LOG_STAT_KEYS = (
+    "pts", "reb", "ast", "blk", "stl", "fg3m", "min",
+    "fgm", "fga", "fg3a", "ftm", "fta", "turnover",
+)
+
+# The full BallDontLie row roughly doubles the size of nba.games; only keep
+# it when explicitly asked for (e.g. KEEP_RAW=1 while debugging)
+KEEP_RAW = bool(os.getenv("KEEP_RAW"))
+
+
+def _normalize_game_log(stat: Dict[str, Any]) -> Dict[str, Any]:
+    game = stat.get("game", {})
+    # game/team ids and dates repeat across every player row of a game, so
+    # intern them to share one string object per value
+    rec = {
+        "game_id": sys.intern(str(game.get("id"))),
+        "game_date": sys.intern(game.get("date", "")[:10]),  # ISO string
+        "player_id": str(stat.get("player", {}).get("id")),
+        "team_id": sys.intern(str(stat.get("team", {}).get("id"))),
+    }
+    # map() binds stat.get once and runs the lookups in C
+    rec.update(zip(GAME_LOG_STAT_KEYS, map(stat.get, GAME_LOG_STAT_KEYS)))
+    if KEEP_RAW:
+        rec["raw"] = stat
+    return rec
 
 
 # ================================
@@ -276,55 +262,105 @@ def main() -> None:
 
     bundle = load_existing_bundle()
 
+    # Every fetch below is I/O-bound and independent apart from two chains
+    # (schedule -> game logs, league info -> transactions), so run them all on
+    # one pool and only block where a result is actually needed.
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        f_schedule = pool.submit(fetch_data.fetch_nba_schedule, NBA_SEASON_YEAR)
+        # Sleeper fetchers run strict: any failure raises instead of coming back empty
+        f_league = pool.submit(fetch_data.fetch_sleeper_league_metadata, LEAGUE_ID, raise_on_error=True)
+        f_rosters = pool.submit(fetch_data.fetch_sleeper_rosters, LEAGUE_ID, raise_on_error=True)
+        f_players = pool.submit(fetch_data.fetch_sleeper_players, raise_on_error=True)
+        f_injuries = pool.submit(fetch_data.fetch_espn_injuries)
+
+        # ---- NBA schedule ----
+        # Needed first so the game-log fetch can skip days with no games
+        bundle["nba"]["schedule"] = parse_nba_schedule(f_schedule.result())
+        scheduled_dates = {g["game_date"] for g in bundle["nba"]["schedule"] if g.get("game_date")}
+
+        start_date = get_fetch_start_date(bundle)
+        logger.info("Fetching game logs from %s", start_date)
+        # Dates that failed on earlier runs sit behind the cursor; retry them too
+        pending_dates = get_pending_dates(bundle)
+        failed_dates: List[date] = []
+        f_games = pool.submit(
+            fetch_data.fetch_nba_game_logs_since, start_date,
+            scheduled_dates=scheduled_dates,
+            retry_dates=pending_dates,
+            failed_dates=failed_dates,
+        )
+
+        # ---- Sleeper league + rosters + users ----
+        # If Sleeper is down, fail the job (we actually want this to be visible)
+        try:
+            league_meta = f_league.result()
+            league_info = league_meta["league"]
+            f_transactions = pool.submit(
+                fetch_data.fetch_sleeper_transactions, LEAGUE_ID,
+                league=league_info, raise_on_error=True,
+            )
+            users_list = league_meta["users"]
+            rosters_list = f_rosters.result()
+            transactions_list = f_transactions.result()
+            players_dict = f_players.result()
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to fetch Sleeper data: {e}") from e
+
+        injuries_data = f_injuries.result()
+        # Without a key nothing is fetched; a rejected key (401) raises
+        games_authenticated = bool(os.getenv("BALLDONTLIE_API_KEY"))
+        try:
+            raw_games = f_games.result()
+        except fetch_data.BallDontLieAuthError as e:
+            logger.warning("%s", e)
+            raw_games, games_authenticated = [], False
+
     # ---- Incremental game logs ----
-    last_game_date = get_last_game_date(bundle)
-    print(f"Last game date in bundle: {last_game_date}")
-    new_games = fetch_nba_game_logs_since(last_game_date + timedelta(days=1))
+    new_games = [_normalize_game_log(stat) for stat in raw_games]
     if new_games:
         merge_game_logs(bundle, new_games)
-
-    # ---- NBA schedule ----
-    bundle["nba"]["schedule"] = fetch_nba_schedule(NBA_SEASON_YEAR)
-
-    # ---- Sleeper league + rosters + users ----
-    try:
-        league_info = fetch_sleeper_league_info(LEAGUE_ID)
-        users_list = fetch_sleeper_users(LEAGUE_ID)
-        rosters_list = fetch_sleeper_rosters(LEAGUE_ID)
-        transactions_list = fetch_sleeper_transactions(LEAGUE_ID)
-        players_dict = fetch_sleeper_players()
-    except Exception as e:
-        # If Sleeper is down, fail the job (we actually want this to be visible)
-        raise RuntimeError(f"Failed to fetch Sleeper data: {e}") from e
+    if games_authenticated:
+        # Only advance through yesterday: today's games usually haven't been
+        # played yet when the nightly job runs. Runs with no key or a rejected
+        # key fetched nothing, so they leave the cursor and pending dates alone.
+        cursor = max(start_date - timedelta(days=1), date.today() - timedelta(days=1))
+        bundle["meta"]["last_cursor_date"] = cursor.strftime("%Y-%m-%d")
+        bundle["meta"]["pending_dates"] = sorted({d.isoformat() for d in failed_dates})
+        if failed_dates:
+            logger.warning("%d dates failed; they will be retried next run.", len(set(failed_dates)))
 
     # Map users by user_id for easy frontend lookup
-    users_by_id = {}
-    for u in users_list:
-        uid = u.get("user_id")
-        if uid:
-            users_by_id[uid] = u
+    users_by_id = {u["user_id"]: u for u in users_list if u.get("user_id")}
 
     bundle["league"]["info"] = league_info
     bundle["league"]["users"] = users_by_id
     bundle["league"]["rosters"] = rosters_list
     bundle["league"]["transactions"] = transactions_list
-    bundle["league"]["players"] = players_dict
+    # The Sleeper player pool is the largest object in the bundle; store it
+    # once under nba.players and point league readers there
+    bundle["league"].pop("players", None)
+    bundle["league"]["players_ref"] = "nba.players"
 
     # ---- ESPN injuries ----
-    bundle["nba"]["injuries"] = fetch_espn_injuries()
+    bundle["nba"]["injuries"] = parse_espn_injuries(injuries_data)
 
     # ---- NBA metadata (from Sleeper players for now) ----
-    # Just copy the Sleeper NBA player pool so frontend has player metadata
+    # Canonical home of the Sleeper NBA player pool (see league.players_ref)
     bundle["nba"]["players"] = players_dict
 
     # ---- Meta fields ----
-    bundle["meta"]["last_updated"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-    # after merging, recompute last_game_date
-    bundle["meta"]["last_game_date"] = get_last_game_date(bundle).strftime("%Y-%m-%d")
+    bundle["meta"]["last_updated"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    # merge_game_logs keeps last_game_date current; only fill it in if unset
+    # (or left malformed by an older run)
+    if not _is_iso_date(bundle["meta"].get("last_game_date")):
+        bundle["meta"]["last_game_date"] = get_last_game_date(bundle).strftime("%Y-%m-%d")
 
     save_bundle(bundle)
-    print("Update complete.")
+    logger.info("Update complete.")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     main()